@@ -1,9 +1,113 @@
-from typing import Optional
-from dotenv import dotenv_values, set_key
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.llms import DeepInfra
-from .utils import get_os_info
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from .utils import get_current_shell, get_os_info, load_config
+
+# langchain is slow to import, so it is only loaded once an LLM or prompt is needed
+if TYPE_CHECKING:
+    from langchain.llms import DeepInfra
+    from langchain.prompts import PromptTemplate
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.1"
+
+# Labelled lines of the response format requested in build_prompt_template
+_FIELD_RE = re.compile(r"^[ \t]*(command|description):[ \t]*(.*)$", re.IGNORECASE | re.MULTILINE)
+
+# Generation settings, keyed by whether an explanation is requested
+_MODEL_KWARGS = {
+    explain: {'temperature': 0.7, 'repetition_penalty': 1.2,
+              'max_new_tokens': 1000 if explain else 250, 'top_p': 0.9}
+    for explain in (False, True)
+}
+
+# LLM clients keyed by (api_key, model_id), least recently used first
+_LLM_CACHE_MAXSIZE = 8
+_llm_cache: "OrderedDict[Tuple[Optional[str], str], DeepInfra]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+
+def get_cached_llm(api: Optional[str], model_id: str = MODEL_ID) -> "DeepInfra":
+    """Return a DeepInfra client for the given key and model, creating it on first use."""
+    cache_key = (api, model_id)
+    llm = _llm_cache.get(cache_key)
+    if llm is None:
+        # Only the miss path takes the lock; re-check so racing threads share one client
+        with _llm_cache_lock:
+            llm = _llm_cache.get(cache_key)
+            if llm is None:
+                from langchain.llms import DeepInfra
+
+                llm = _llm_cache[cache_key] = DeepInfra(model_id=model_id,
+                                                        deepinfra_api_token=api)
+                if len(_llm_cache) > _LLM_CACHE_MAXSIZE:
+                    _llm_cache.popitem(last=False)
+                return llm
+    try:
+        _llm_cache.move_to_end(cache_key)
+    except KeyError:
+        # Evicted concurrently; the client we hold is still usable
+        pass
+    return llm
+
+
+def clear_llm_cache() -> None:
+    """Drop every cached LLM client."""
+    with _llm_cache_lock:
+        _llm_cache.clear()
+
+
+# Fixed prompt skeleton; the $-holes are filled once per (os, shell, explain),
+# leaving {wish} as the only placeholder for request time
+_PROMPT_TEMPLATE = Template(
+    "Instructions: Write a CLI command that does the following: {wish}. "
+    "Make sure the command is correct and works on $os_fullname using $shell. "
+    "${explain_text}Format: $format_text \nPlease adhere strictly to the format provided above."
+)
+_FORMAT_TEXT = "Command: <insert_command_here>"
+_EXPLAIN_TEXT = "Also, provide a brief and concise description of how the command works."
+_EXPLAIN_FORMAT_TEXT = "\nDescription: <insert_description_here>"
+_FORMAT_SUFFIX = "\nDo not enclose the command with extra quotes or backticks."
+
+
+@lru_cache(maxsize=8)
+def build_prompt_template(os_fullname: Optional[str], shell: Optional[str], explain: bool = False) -> str:
+    """Build the prompt template string, with a single {wish} placeholder, for the given OS and shell."""
+    format_text = _FORMAT_TEXT + (_EXPLAIN_FORMAT_TEXT if explain else "") + _FORMAT_SUFFIX
+    # Escape braces so detected names cannot add placeholders to the template
+    return _PROMPT_TEMPLATE.substitute(
+        os_fullname=str(os_fullname).replace("{", "{{").replace("}", "}}"),
+        shell=str(shell).replace("{", "{{").replace("}", "}}"),
+        explain_text=_EXPLAIN_TEXT if explain else "",
+        format_text=format_text,
+    )
+
+
+@lru_cache(maxsize=8)
+def build_prompt(os_fullname: Optional[str], shell: Optional[str], explain: bool = False) -> "PromptTemplate":
+    """Build the langchain prompt for the given OS and shell."""
+    from langchain.prompts import PromptTemplate
+
+    template = build_prompt_template(os_fullname, shell, explain)
+    prompt_variables = ["wish"]
+    return PromptTemplate(template=template, input_variables=prompt_variables)
+
+
+def parse_response(response: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract the command and, if present, its description from the raw LLM response."""
+    if ":" not in response:
+        # No label can be present, skip the regex machinery
+        return None, None
+    fields: Dict[str, str] = {}
+    # One pass over the response; the last occurrence of each label wins, as in the original line loop
+    for match in _FIELD_RE.finditer(response):
+        fields[match.group(1).lower()] = match.group(2).strip()
+    command = fields.get("command")
+    description = fields.get("description")
+    return command, description
+
 
 class djinn():
     """
@@ -20,38 +124,31 @@ class djinn():
         api: The API key for the DeepInfra API. If not provided, it will be automatically detected from the .env file.
         """
         
-        if os_fullname is None or shell is None:
-            os_fullname, shell = get_os_info()
-        if api is not None:
-            config=dotenv_values()
-            api=config['DEEPINFRA_API_TOKEN']
+        if os_fullname is None:
+            _, os_fullname = get_os_info()
+        if shell is None:
+            shell = get_current_shell()
+        if api is None:
+            api = load_config().get('DEEPINFRA_API_TOKEN')
         self.os_fullname = os_fullname
         self.shell = shell
-        self.llm = DeepInfra(model_id="mistralai/Mistral-7B-Instruct-v0.1", 
-                             deepinfra_api_token=api)
+        self.api = api
 
         return None
+
+    @property
+    def llm(self) -> "DeepInfra":
+        """
+        The DeepInfra client, created on first use so that building prompts does not import langchain.
+        """
+        return get_cached_llm(self.api)
         
-    def _build_prompt(self, explain: bool = False):
+    def _build_prompt(self, explain: bool = False) -> "PromptTemplate":
         """
         This function builds the prompt for the DeepInfra API. It takes the following parameters:
         explain: A boolean value that indicates whether the user wants to provide an explanation of how the command works. If True, the prompt will include a description of the command.
         """
-
-        explain_text = ""
-        format_text = "Command: <insert_command_here>"
-        os_fullname = self.os_fullname
-        shell = self.shell
-
-        if explain:
-            explain_text = "Also, provide a brief and concise description of how the command works."
-            format_text += "\nDescription: <insert_description_here>"
-        format_text += "\nDo not enclose the command with extra quotes or backticks."
-
-        template = f"""Instructions: Write a CLI command that does the following: {{wish}}. Make sure the command is correct and works on {os_fullname} using {shell}. {explain_text}Format: {format_text} \nPlease adhere strictly to the format provided above."""
-        prompt_variables = ["wish"]
-        prompt = PromptTemplate(template=template, input_variables=prompt_variables)
-        return prompt
+        return build_prompt(self.os_fullname, self.shell, bool(explain))
 
     def test_prompt(self, wish: str, explain: bool = False):
         """
@@ -59,8 +156,9 @@ class djinn():
         wish: The command the user wants to generate.
         explain: A boolean value that indicates whether the user wants to provide an explanation of how the command works. If True, the prompt will include a description of the command.
         """
-        prompt = self._build_prompt(explain)
-        promt_text = prompt.format(wish = wish)
+        # Plain str.format gives the same text as PromptTemplate.format without importing langchain
+        template = build_prompt_template(self.os_fullname, self.shell, bool(explain))
+        promt_text = template.format(wish = wish)
 
         return promt_text
 
@@ -72,33 +170,13 @@ class djinn():
         explain: A boolean value that indicates whether the user wants to provide an explanation of how the command works. If True, the prompt will include a description of the command.
         llm_verbose: A boolean value that indicates whether the user wants to see the output of the LLM model. If True, the output of the LLM model will be printed.
         """
-        
-        if explain:
-            max_tokens = 1000
-        else:
-            max_tokens = 250
-        
-        self.llm.model_kwargs = {'temperature': 0.7, 'repetition_penalty': 1.2, 
-                            'max_new_tokens': max_tokens, 'top_p': 0.9}
+        from langchain.chains import LLMChain
+
         prompt = self._build_prompt(explain)
 
-        llm_chain = LLMChain(prompt=prompt,llm=self.llm, verbose=llm_verbose)
+        # Settings go per call; the cached client is shared and must not be mutated
+        llm_chain = LLMChain(prompt=prompt, llm=self.llm,
+                             llm_kwargs=dict(_MODEL_KWARGS[bool(explain)]),
+                             verbose=llm_verbose)
         response = llm_chain.run(wish)
-        responses_items = response.strip().split("\n")
-
-        command = None
-        description = None
-        for element in responses_items:
-            if "command:" in element.lower():
-                command = element
-                command.replace("Command: ", "").strip()
-
-            elif "description:" in element.lower():
-                description = element
-                description.replace("Description: ", "").strip()
-
-            if command is not None and description is not None:
-
-                return response
-
-        return command, description
\ No newline at end of file
+        return parse_response(response)
@@ -1,10 +1,9 @@
-import sys
-import os
 import argparse
-from dotenv import set_key, dotenv_values
 from .djinn import djinn
-from .utils import get_bolded_text, get_os_info, print_text
-from pathlib import Path
+from .utils import get_bolded_text, get_current_shell, get_env_path, get_os_info, load_config, print_text
+
+YES_RESPONSES = frozenset({"yes", "y"})
+OS_FAMILIES = {"windows": "Windows", "macos": "MacOS", "linux": "Linux"}
 
 def code_djinn():
 
@@ -52,30 +51,28 @@ def init():
     """"
     Initialize the configuration to get the variables os_family, shell and api_key
     """
+    from dotenv import set_key
 
     os_family, os_fullname = get_os_info()
-    app_dir = os.path.dirname(sys.modules[__name__].__file__)
-    env_path = Path(app_dir) / ".env"
+    env_path = get_env_path()
 
+    confirmed = False
     if os_family:
         print_text(f"Detected OS: {os_fullname} \n", color="green")
         answer=input(f'Type yes to confirm or no to input manually: ')
-        if answer.lower() == 'yes' or 'y':
-            pass
-        else:
-            os_family = input("What is your OS family? (e.g. Windows, MacOS, Linux): ")
-
-    if os_family in ("Linux", "MacOS"):
-        shell_str = os.environ.get("SHELL") or ""
-        if "bash" in shell_str:
-            shell = "bash"
-        elif "zsh" in shell_str:
-            shell = "zsh"
-        elif "fish" in shell_str:
-            shell = "fish"
-        else:
-            shell = input("What shell are you using? ")
-    
+        confirmed = answer.strip().lower() in YES_RESPONSES
+
+    if not confirmed:
+        os_family = input("What is your OS family? (e.g. Windows, MacOS, Linux): ").strip()
+        os_fullname = input("What is your OS full name? (e.g. Ubuntu 22.04, macOS 14, Windows 11): ").strip()
+        # Store the canonical spelling of known families, whatever case was typed
+        os_family = OS_FAMILIES.get(os_family.lower(), os_family)
+
+    if os_family == "Windows":
+        shell = input("What shell are you using? (e.g. PowerShell, cmd) ")
+    else:
+        shell = get_current_shell() or input("What shell are you using? ")
+
     api_key = input("What is your DeepInfra API key? ")
 
     # Save config
@@ -105,9 +102,7 @@ def ask(
     Ask the djinn for a command, main tool of the CLI
     """
     # Load vars
-    app_dir = os.path.dirname(sys.modules[__name__].__file__)
-    env_path = Path(app_dir) / ".env"
-    config = dotenv_values(env_path)
+    config = load_config()
     
     # Init dinnn
     thedjinn = djinn(os_fullname=config['OS_FULLNAME'],
@@ -134,7 +129,7 @@ def test(    wish: str,
     """"
     Test the promt for a given wish
     """
-    config = dotenv_values()
+    config = load_config()
     thedjinn = djinn(os_fullname=config['OS_FULLNAME'],
                      shell=config['SHELL'],
                      api=config['DEEPINFRA_API_TOKEN'])
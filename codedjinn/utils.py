@@ -1,6 +1,10 @@
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Optional, TextIO
+import os
 import platform
 
+@lru_cache(maxsize=None)
 def get_os_info():
     oper_sys = platform.system()
     if oper_sys == "Windows" or oper_sys == "Darwin":
@@ -10,6 +14,39 @@ def get_os_info():
         return (oper_sys, platform.freedesktop_os_release()["PRETTY_NAME"])
     return (None, None)
 
+@lru_cache(maxsize=None)
+def get_current_shell() -> Optional[str]:
+    """Guess the user's shell from the SHELL environment variable."""
+    shell_str = os.environ.get("SHELL") or ""
+    for shell in ("bash", "zsh", "fish"):
+        if shell in shell_str:
+            return shell
+    return None
+
+_ENV_PATH = Path(os.path.dirname(__file__)) / ".env"
+_ENV_PATH_STR = str(_ENV_PATH)
+
+def get_env_path() -> Path:
+    """Path of the .env file holding the code_djinn configuration."""
+    return _ENV_PATH
+
+@lru_cache(maxsize=1)
+def _read_config(env_path: str, mtime_ns: int, size: int) -> Dict[str, Optional[str]]:
+    # mtime and size are only part of the cache key, so edits to the file invalidate it
+    from dotenv import dotenv_values
+
+    return dotenv_values(env_path)
+
+def load_config(env_path: Optional[Path] = None) -> Dict[str, Optional[str]]:
+    """Load the configuration, parsing the .env file only when it changed since the last call."""
+    env_path = str(env_path) if env_path else _ENV_PATH_STR
+    try:
+        st = os.stat(env_path)
+    except FileNotFoundError:
+        return {}
+    # Copy so callers cannot modify the cached parse
+    return dict(_read_config(env_path, st.st_mtime_ns, st.st_size))
+
 _TEXT_COLOR_MAPPING = {
     "blue": "36;1",
     "yellow": "33;1",